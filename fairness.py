@@ -1,9 +1,10 @@
 # fairness.py
 # -*- coding: utf-8 -*-
 """
-SciPy/Statsmodels 없이 동작하는 통계 유틸
+SciPy/Statsmodels 없이 동작하는 통계 유틸 (SciPy가 있으면 ndtr/betainc 사용)
 - 균일성(카이제곱) 검정: Wilson–Hilferty 정규근사로 p-value 근사
-- 쌍 공출현 유의성(이항 상향 단측): 정규근사(+연속성 보정)로 p-value 근사
+- 쌍 공출현 유의성(이항 상향 단측): SciPy 있으면 정확한 이항 꼬리(betainc),
+  없으면 정규근사(+연속성 보정)로 p-value 근사
 - Benjamini–Hochberg FDR 보정: 순수 NumPy 구현
 주의: 근사치 기반이라 극단적인 꼬리에서 p-value 정확도가 다소 떨어질 수 있음.
 """
@@ -11,12 +12,26 @@ SciPy/Statsmodels 없이 동작하는 통계 유틸
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-from math import comb, sqrt, log, erf
+from math import comb, sqrt, log, erfc
 
-# -------- 공통: 표준정규 CDF --------
-def _phi(z: float) -> float:
-    """표준정규 CDF Φ(z). math.erf 사용."""
-    return 0.5 * (1.0 + erf(z / sqrt(2.0)))
+try:
+    # SciPy가 있으면 Cephes 기반 ndtr/betainc(C 구현, 벡터화) 사용
+    from scipy.special import ndtr as _ndtr, betainc as _betainc
+except ImportError:
+    _ndtr = _betainc = None
+
+_erfc = np.vectorize(erfc, otypes=[float])
+
+# -------- 공통: 표준정규 상측확률 --------
+def _norm_sf(z) -> np.ndarray:
+    """
+    표준정규 상측확률 1 - Φ(z) (스칼라/배열).
+    SciPy ndtr(-z) 우선, 없으면 math.erfc 폴백. 둘 다 꼬리에서 1 - Φ(z)보다 정확.
+    """
+    z = np.asarray(z, dtype=float)
+    if _ndtr is not None:
+        return _ndtr(-z)
+    return 0.5 * _erfc(z / sqrt(2.0))
 
 # -------- 1) 카이제곱 균일성 검정 (근사) --------
 def chi_square_uniform(freq: pd.Series) -> dict:
@@ -44,28 +59,45 @@ def chi_square_uniform(freq: pd.Series) -> dict:
     y = (stat / df) ** (1.0 / 3.0) if stat > 0 else 0.0
     z = (y - (1 - 2.0 / (9.0 * df))) / sqrt(2.0 / (9.0 * df))
     # 상측 확률: P(Chi2 >= stat) ≈ 1 - Φ(z)
-    pval = max(0.0, min(1.0, 1.0 - _phi(z)))
+    pval = max(0.0, min(1.0, float(_norm_sf(z))))
     return {"stat": stat, "pvalue": pval, "total": int(n)}
 
 # -------- 2) 쌍 공출현 유의성 (Binomial 상향 단측, 근사) --------
-def _binom_sf_normal_approx(k: int, n: int, p: float) -> float:
+def _binom_sf_normal_approx(k, n: int, p: float) -> np.ndarray:
     """
     Binomial(n, p)에서 P(X >= k) 근사 (정규근사 + 연속성 보정).
+    k는 스칼라 또는 배열(쌍 전체를 한 번에 계산).
     n이 충분히 크고 np(1-p)도 충분하면 사용 권장.
     """
+    k = np.asarray(k, dtype=float)
     if n <= 0:
-        return 1.0 if k <= 0 else 0.0
+        return np.where(k <= 0, 1.0, 0.0)
     mu = n * p
     var = n * p * (1.0 - p)
     if var <= 0:
         # p == 0 또는 1인 극단
-        return 1.0 if (p == 0.0 and k <= 0) or (p == 1.0 and k <= n) else 0.0
+        return np.where(((p == 0.0) & (k <= 0)) | ((p == 1.0) & (k <= n)), 1.0, 0.0)
     # 연속성 보정: k -> k - 0.5
     z = ((k - 0.5) - mu) / sqrt(var)
-    # 상측 확률
-    sf = 1.0 - _phi(z)
+    # 상측 확률 1 - Φ(z)
+    sf = _norm_sf(z)
     # 수치 안정화
-    return max(0.0, min(1.0, sf))
+    return np.clip(sf, 0.0, 1.0)
+
+def _binom_sf(k, n: int, p: float) -> np.ndarray:
+    """
+    Binomial(n, p)에서 P(X >= k).
+    SciPy가 있으면 정확한 항등식 P(X >= k) = I_p(k, n-k+1) (정규화 불완전 베타),
+    없으면 정규근사로 폴백. 기대도수가 작은 쌍에서도 꼬리가 정확함.
+    """
+    if _betainc is None or n <= 0 or not (0.0 < p < 1.0):
+        return _binom_sf_normal_approx(k, n, p)
+    k = np.asarray(k, dtype=float)
+    # k <= 0 → 1, k > n → 0 (betainc 정의역 밖)
+    sf = np.where(k <= 0, 1.0, 0.0)
+    inner = (k > 0) & (k <= n)
+    sf[inner] = _betainc(k[inner], n - k[inner] + 1.0, p)
+    return sf
 
 def pair_significance_binomial(
     co_mat: pd.DataFrame,
@@ -77,40 +109,40 @@ def pair_significance_binomial(
     공출현 횟수(co_count)가 무작위 가정하에서 과대표현인지(상향 단측) 근사 검정.
     - 각 회차 m개 추출: m=6(보너스 제외) / m=7(보너스 포함)
     - 쌍 동시 등장 확률 p_pair = C(45-2, m-2) / C(45, m)
-    - X ~ Binomial(n_draws, p_pair), p-value ≈ Normal Approx (연속성 보정)
+    - X ~ Binomial(n_draws, p_pair), p-value = 정확한 이항 꼬리 (SciPy 미설치 시 정규근사)
     - 다중검정: Benjamini–Hochberg FDR 보정
     """
     m = 7 if include_bonus else 6
     p_pair = comb(45 - 2, m - 2) / comb(45, m)
 
-    # 테이블 전개
-    labels = list(map(int, co_mat.index))
-    rows = []
-    for i in range(len(labels)):
-        for j in range(i + 1, len(labels)):
-            a, b = labels[i], labels[j]
-            co = int(co_mat.loc[str(a), str(b)])
-            exp = n_draws * p_pair
-            pval = _binom_sf_normal_approx(co, n_draws, p_pair)
-            lift = co / exp if exp > 0 else np.nan
-            rows.append((a, b, co, exp, pval, lift))
+    # 테이블 전개 (상삼각 990쌍을 한 번에)
+    M = co_mat.to_numpy()
+    labels = np.asarray(co_mat.index, dtype=int)
+    i_idx, j_idx = np.triu_indices(M.shape[0], k=1)
+    co = M[i_idx, j_idx].astype(np.int64)
+    exp = n_draws * p_pair
+    pvals = _binom_sf(co, n_draws, p_pair)
+    lift = co / exp if exp > 0 else np.full(len(co), np.nan)
 
-    df = pd.DataFrame(rows, columns=["num_a", "num_b", "co_count", "expected", "pvalue", "lift"])
+    df = pd.DataFrame({
+        "num_a": labels[i_idx], "num_b": labels[j_idx], "co_count": co,
+        "expected": exp, "pvalue": pvals, "lift": lift,
+    })
 
     # Benjamini–Hochberg FDR (q-value) 구현
     if len(df) > 0:
         p = df["pvalue"].to_numpy()
         mtests = float(len(p))
-        order = np.argsort(p)
+        order = np.argsort(p, kind="stable")
         ranked = p[order]
         # 누적 최소화로 q 계산
         q = ranked * mtests / (np.arange(1, len(ranked) + 1))
-        # 뒤에서부터 누적 최소
-        for k in range(len(q) - 2, -1, -1):
-            q[k] = min(q[k], q[k + 1])
-        qvals = np.empty_like(q)
-        qvals[order] = q
-        df["qvalue"] = qvals
+        # 뒤에서부터 누적 최소 (C 레벨 한 번의 스캔)
+        q = np.clip(np.minimum.accumulate(q[::-1])[::-1], 0.0, 1.0)
+        # 역순열로 원래 순서 복원
+        inv = np.empty_like(order)
+        inv[order] = np.arange(len(order))
+        df["qvalue"] = q[inv]
         df["significant"] = df["qvalue"] <= alpha
     else:
         df["qvalue"] = []
@@ -2,19 +2,31 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import email.utils
+import functools
 import json
 import os
 import re
 import shutil
 import tempfile
+import threading
 import time
-from typing import Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
+try:
+    import pyarrow as pa  # 선택: Parquet 캐시
+    import pyarrow.parquet as pq
+    _HAS_PARQUET = True
+except ImportError:
+    _HAS_PARQUET = False
+
 # Official draw JSON endpoint (works even when Content-Type is text/html).
 # Some environments are more reliable when parameters are ordered as drwNo first.
 BASE_URLS = [
@@ -38,6 +50,11 @@ BROWSER_HEADERS = {
 
 EMPTY_DF_COLUMNS = ["draw_no", "date", "n1", "n2", "n3", "n4", "n5", "n6", "bonus"]
 
+# 회차 수집 병렬도 (네트워크 RTT 은닉용). 1이면 기존처럼 순차 수집.
+COLLECT_WORKERS = 8
+# 429(Too Many Requests) 응답 시 지수 백오프 재시도 횟수
+MAX_RETRIES_429 = 3
+
 
 def _bootstrap_session(session: requests.Session) -> None:
     # 쿠키/세션 확보(환경에 따라 API 직접 호출이 홈으로 튕기는 경우 완화)
@@ -76,7 +93,11 @@ def _fetch_draw_json(drw_no: int, session: requests.Session) -> Optional[Dict]:
         for tpl in BASE_URLS:
             url = tpl.format(drwNo=drw_no)
             # allow_redirects=False: detect "홈으로 튕김(3xx)" explicitly.
-            r = session.get(url, headers=BROWSER_HEADERS, timeout=10, allow_redirects=False)
+            for attempt in range(MAX_RETRIES_429 + 1):
+                r = session.get(url, headers=BROWSER_HEADERS, timeout=10, allow_redirects=False)
+                if r.status_code != 429 or attempt == MAX_RETRIES_429:
+                    break
+                time.sleep(0.5 * 2 ** attempt)  # 서버 측 throttling → 백오프
 
             if 300 <= r.status_code < 400:
                 continue  # redirected -> likely blocked in this environment
@@ -120,47 +141,94 @@ def find_latest_draw(session: requests.Session, start_guess: int = 1600) -> int:
 
     Strategy:
       1) Parse from official result page (fast & robust).
-      2) Fallback: probe API by stepping down then up (older logic).
+      2) Fallback: probe API with doubling + binary search (O(log N) requests).
     """
     # 1) robust parse from /lt645/result
     latest = _latest_draw_from_result_page(session)
     if isinstance(latest, int) and latest > 0:
         return latest
 
-    # 2) fallback probing (may be slow if blocked)
-    hi = start_guess
-    while hi > 1 and _fetch_draw_json(hi, session) is None:
-        hi -= 10
-    if hi < 1:
-        hi = 1
-    while _fetch_draw_json(hi + 1, session) is not None:
-        hi += 1
-    return hi
+    # 2) fallback probing: lo = 존재하는 회차(1회는 존재 가정), hi = 없는 회차
+    lo, hi = 1, max(start_guess, 1)
+    while _fetch_draw_json(hi, session) is not None:
+        lo, hi = hi, hi * 2
+    while lo + 1 < hi:
+        mid = (lo + hi) // 2
+        if _fetch_draw_json(mid, session) is not None:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _draw_row(n: int, data: Dict) -> Dict:
+    nums = [data.get(f"drwtNo{i}") for i in range(1, 7)]
+    return {
+        "draw_no": n,
+        "date": data.get("drwNoDate"),
+        "n1": nums[0],
+        "n2": nums[1],
+        "n3": nums[2],
+        "n4": nums[3],
+        "n5": nums[4],
+        "n6": nums[5],
+        "bonus": data.get("bnusNo"),
+    }
+
+
+def _worker_session(parent: requests.Session) -> requests.Session:
+    """스레드 전용 세션: 부모 세션의 쿠키(부트스트랩 결과)를 복사해 재사용."""
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.cookies.update(parent.cookies)
+    s._bootstrapped = getattr(parent, "_bootstrapped", False)
+    return s
 
 
-def collect_range(session: requests.Session, start_no: int, end_no: int) -> pd.DataFrame:
+def collect_range(session: requests.Session, start_no: int, end_no: int,
+                  max_workers: int = COLLECT_WORKERS) -> pd.DataFrame:
+    draw_nos = range(start_no, end_no + 1)
+    desc = f"Collect {start_no}-{end_no}"
     rows = []
-    for n in tqdm(range(start_no, end_no + 1), desc=f"Collect {start_no}-{end_no}"):
-        data = _fetch_draw_json(n, session)
-        if data is None:
-            continue
-        nums = [data.get(f"drwtNo{i}") for i in range(1, 7)]
-        bonus = data.get("bnusNo")
-        date = data.get("drwNoDate")
-        rows.append(
-            {
-                "draw_no": n,
-                "date": date,
-                "n1": nums[0],
-                "n2": nums[1],
-                "n3": nums[2],
-                "n4": nums[3],
-                "n5": nums[4],
-                "n6": nums[5],
-                "bonus": bonus,
-            }
-        )
-        time.sleep(0.01)
+
+    if max_workers <= 1 or len(draw_nos) <= 1:
+        for n in tqdm(draw_nos, desc=desc):
+            data = _fetch_draw_json(n, session)
+            if data is not None:
+                rows.append(_draw_row(n, data))
+    else:
+        # 부트스트랩(쿠키 확보)은 부모 세션에서 한 번만 → 워커 세션에 복사
+        if not getattr(session, "_bootstrapped", False):
+            try:
+                _bootstrap_session(session)
+                session._bootstrapped = True
+            except Exception:
+                pass
+
+        local = threading.local()
+        sessions: List[requests.Session] = []
+        lock = threading.Lock()
+
+        def fetch(n: int) -> Optional[Dict]:
+            s = getattr(local, "session", None)
+            if s is None:
+                s = local.session = _worker_session(session)
+                with lock:
+                    sessions.append(s)
+            return _fetch_draw_json(n, s)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as ex:
+                futs = {ex.submit(fetch, n): n for n in draw_nos}
+                for f in tqdm(as_completed(futs), total=len(futs), desc=desc):
+                    data = f.result()
+                    if data is not None:
+                        rows.append(_draw_row(futs[f], data))
+        finally:
+            for s in sessions:
+                s.close()
 
     # 수집 0건이면 컬럼 포함 빈 DF 반환 (KeyError 방지)
     if not rows:
@@ -169,11 +237,74 @@ def collect_range(session: requests.Session, start_no: int, end_no: int) -> pd.D
     return pd.DataFrame(rows).sort_values("draw_no").reset_index(drop=True)
 
 
+def _parquet_path(csv_path: str) -> str:
+    # CSV(사람용 원본) 옆에 두는 Parquet 사이드카 캐시
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+_PARQUET_SIG_KEY = b"lotto_csv_sig"
+
+
+def _csv_signature(csv_path: str) -> bytes:
+    # 캐시를 만든 시점의 CSV (크기, mtime_ns) → 교체/복원/수동 수정 감지용
+    info = os.stat(csv_path)
+    return f"{info.st_size}:{info.st_mtime_ns}".encode("ascii")
+
+
+def _load_parquet_cache(csv_path: str) -> Optional[pd.DataFrame]:
+    """Parquet 캐시가 현재 CSV로 만든 것이면 읽기 (타입 보존 → 파싱/형변환 생략). 아니거나 실패 시 None."""
+    pq_path = _parquet_path(csv_path)
+    if not _HAS_PARQUET or not os.path.exists(pq_path):
+        return None
+    try:
+        table = pq.read_table(pq_path)
+        if (table.schema.metadata or {}).get(_PARQUET_SIG_KEY) != _csv_signature(csv_path):
+            return None  # CSV가 바뀜(수동 수정/교체/복원) → CSV 우선
+        return table.to_pandas()
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=4)
+def _read_draws_cached(csv_path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    # (경로, mtime, 크기)가 같으면 파일이 그대로라고 보고 파싱 결과 재사용
+    cached = _load_parquet_cache(csv_path)
+    if cached is not None:
+        return cached
+    return pd.read_csv(csv_path, dtype={"draw_no": int, "date": str, "bonus": int})
+
+
 def load_csv(csv_path: str) -> pd.DataFrame:
     if not os.path.exists(csv_path):
         os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
         return pd.DataFrame(columns=EMPTY_DF_COLUMNS)
-    return pd.read_csv(csv_path, dtype={"draw_no": int, "date": str, "bonus": int})
+    info = os.stat(csv_path)
+    # 캐시 객체가 호출 측 수정으로 오염되지 않도록 사본 반환
+    return _read_draws_cached(os.path.abspath(csv_path), info.st_mtime_ns, info.st_size).copy()
+
+
+def _atomic_save_parquet(df: pd.DataFrame, csv_path: str):
+    if not _HAS_PARQUET:
+        return
+    pq_path = _parquet_path(csv_path)
+    out = df.copy()
+    for c in ["n1", "n2", "n3", "n4", "n5", "n6", "bonus"]:
+        if c in out.columns:
+            out[c] = out[c].astype("Int16")  # 1~45: int16로 충분
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(prefix="lotto_", suffix=".parquet", dir=os.path.dirname(pq_path) or ".")
+        os.close(fd)
+        table = pa.Table.from_pandas(out, preserve_index=False)
+        # CSV를 다 쓴 뒤 호출되므로 지금의 CSV 서명을 함께 기록
+        meta = dict(table.schema.metadata or {})
+        meta[_PARQUET_SIG_KEY] = _csv_signature(csv_path)
+        pq.write_table(table.replace_schema_metadata(meta), tmp_path)
+        os.replace(tmp_path, pq_path)
+    except Exception:
+        # 캐시는 부가 기능: 실패해도 CSV만으로 동작
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 
 def _atomic_save_csv(df: pd.DataFrame, csv_path: str):
@@ -184,6 +315,34 @@ def _atomic_save_csv(df: pd.DataFrame, csv_path: str):
     if os.path.exists(csv_path):
         os.remove(csv_path)
     shutil.move(tmp_path, csv_path)
+    _atomic_save_parquet(df, csv_path)
+
+
+def _can_append_csv(raw: pd.DataFrame, existing: pd.DataFrame, csv_path: str) -> bool:
+    """디스크 CSV가 정리(중복 제거·회차 정렬·정수화)된 상태 그대로이고 열 구성이 표준이면 끝에 행만 덧붙여도 됨."""
+    if raw.empty or len(raw) != len(existing) or list(raw.columns) != EMPTY_DF_COLUMNS:
+        return False
+    if not raw["draw_no"].is_monotonic_increasing:
+        return False
+    # 번호 열이 결측 없는 정수 그대로여야 _dedupe_sort 정규화 결과와 같음 (아니면 전체 재작성)
+    nums = raw[["n1", "n2", "n3", "n4", "n5", "n6", "bonus"]]
+    if not all(pd.api.types.is_integer_dtype(t) for t in nums.dtypes) or nums.isna().to_numpy().any():
+        return False
+    try:
+        with open(csv_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+    except OSError:
+        return False
+
+
+def _append_rows_csv(new_df: pd.DataFrame, csv_path: str):
+    # 헤더/BOM 없이 신규 행 bytes만 한 번에 기록 (기존 행 재작성 X)
+    data = new_df[EMPTY_DF_COLUMNS].to_csv(index=False, header=False).encode("utf-8")
+    with open(csv_path, "ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
 
 
 def _dedupe_sort(df: pd.DataFrame) -> pd.DataFrame:
@@ -204,11 +363,49 @@ def _dedupe_sort(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def incremental_update(csv_path: str) -> Tuple[pd.DataFrame, int, int]:
+def _result_page_unchanged_since(session: requests.Session, since: float) -> bool:
+    """결과 페이지 HEAD의 Last-Modified가 since(epoch 초) 이전이면 True.
+
+    헤더가 없거나 요청이 실패하면 False → 평소처럼 최신 회차를 확인.
+    """
+    try:
+        r = session.head(RESULT_PAGE_URL, headers=BROWSER_HEADERS, timeout=5, allow_redirects=True)
+        last_modified = r.headers.get("Last-Modified")
+        if r.status_code != 200 or not last_modified:
+            return False
+        return email.utils.parsedate_to_datetime(last_modified).timestamp() <= since
+    except Exception:
+        return False
+
+
+def _latest_draw_cutoff(existing: pd.DataFrame) -> Optional[float]:
+    """CSV 최신 회차 추첨일의 끝(KST 24시)을 epoch 초로. 날짜를 못 읽으면 None.
+
+    파일 mtime이 아니라 내용 기준 → 수집 일부 실패/복제·복원된 CSV에서도
+    빠진 회차가 있으면 결과 페이지가 더 새것으로 보여 정상 갱신됨.
+    """
+    if existing.empty or "date" not in existing.columns:
+        return None
+    last = pd.to_datetime(existing["date"].iloc[-1], errors="coerce")
+    if pd.isna(last):
+        return None
+    return (last.normalize() + pd.Timedelta(days=1)).tz_localize("Asia/Seoul").timestamp()
+
+
+def incremental_update(csv_path: str, *, head_check: bool = True) -> Tuple[pd.DataFrame, int, int]:
+    """CSV를 최신 회차까지 갱신. 반환: (전체 df, 갱신 전 최대 회차, 최신 회차).
+
+    head_check=True면 결과 페이지 HEAD의 Last-Modified가 CSV 최신 회차 추첨일보다
+    이전인 경우 최신 회차 탐색/수집을 건너뛰고 (df, cur_max, cur_max)를 바로 반환.
+    """
     with requests.Session() as session:
-        latest = find_latest_draw(session)
-        existing = _dedupe_sort(load_csv(csv_path))
+        raw = load_csv(csv_path)
+        existing = _dedupe_sort(raw)
         cur_max = int(existing["draw_no"].max()) if not existing.empty else 0
+        cutoff = _latest_draw_cutoff(existing) if head_check else None
+        if cutoff is not None and _result_page_unchanged_since(session, cutoff):
+            return existing, cur_max, cur_max
+        latest = find_latest_draw(session)
         if cur_max >= latest:
             return existing, cur_max, latest
 
@@ -223,37 +420,115 @@ def incremental_update(csv_path: str) -> Tuple[pd.DataFrame, int, int]:
             )
 
         merged = _dedupe_sort(pd.concat([existing, new_df], ignore_index=True))
-        _atomic_save_csv(merged, csv_path)
+        appended = merged[merged["draw_no"] > cur_max]
+        if _can_append_csv(raw, existing, csv_path) and len(merged) == len(existing) + len(appended):
+            # 주간 갱신은 보통 몇 회차뿐 → 전체 CSV 재작성 대신 신규 행만 append
+            _append_rows_csv(appended, csv_path)
+            _atomic_save_parquet(merged, csv_path)
+        else:
+            _atomic_save_csv(merged, csv_path)
         return merged, cur_max, latest
 
 
 # ---- 분석 유틸 ----
 def frequency(df: pd.DataFrame, include_bonus: bool) -> pd.Series:
     cols = ["n1", "n2", "n3", "n4", "n5", "n6"] + (["bonus"] if include_bonus else [])
-    s = pd.Series(0, index=range(1, 46), dtype=int)
-    for c in cols:
-        s = s.add(df[c].value_counts().reindex(range(1, 46), fill_value=0), fill_value=0).astype(int)
-    s.index.name = "number"
-    s.name = "count"
-    return s
+    # 결측(NA)은 0으로 → 아래 1~45 범위 필터에서 제외 (value_counts와 동일)
+    vals = df[cols].to_numpy(dtype=np.int64, na_value=0).reshape(-1)
+    vals = vals[(vals >= 1) & (vals <= 45)]
+    counts = np.bincount(vals, minlength=46)[1:46]
+    return pd.Series(counts, index=pd.RangeIndex(1, 46, name="number"), name="count")
 
 
 def presence_matrix(df: pd.DataFrame, include_bonus: bool) -> pd.DataFrame:
     cols = ["n1", "n2", "n3", "n4", "n5", "n6"] + (["bonus"] if include_bonus else [])
-    mat = np.zeros((len(df), 45), dtype=int)
-    for i, row in df.iterrows():
-        present = set(int(row[c]) for c in cols)
-        for num in present:
-            if 1 <= num <= 45:
-                mat[i, num - 1] = 1
+    A = df[cols].to_numpy(dtype=np.int64) - 1
+    valid = (A >= 0) & (A < 45)
+    rows = np.broadcast_to(np.arange(len(df))[:, None], A.shape)
+    # 0/1 행렬이므로 int8로 충분 (int64 대비 메모리 1/8)
+    mat = np.zeros((len(df), 45), dtype=np.int8)
+    mat[rows[valid], A[valid]] = 1
     out = pd.DataFrame(mat, columns=[str(i) for i in range(1, 46)])
     out.insert(0, "draw_no", df["draw_no"].values)
     out.insert(1, "date", df["date"].values)
     return out
 
 
-def cooccurrence(only_num: pd.DataFrame) -> pd.DataFrame:
-    X = only_num.values
-    co = X.T @ X
+def presence_bits(df: pd.DataFrame, include_bonus: bool) -> np.ndarray:
+    """회차별 출현 번호를 uint64 비트마스크 1개로 압축 (번호 n → bit n-1, 45비트 사용).
+
+    회차당 8바이트: presence_matrix DataFrame보다는 작지만 presence_array(int8, 45바이트)와는
+    조회 시 풀어야 하는 비용이 있어 캐시/저장용 표현에 가까움.
+    """
+    cols = ["n1", "n2", "n3", "n4", "n5", "n6"] + (["bonus"] if include_bonus else [])
+    A = df[cols].to_numpy(dtype=np.int64, na_value=0)
+    valid = (A >= 1) & (A <= 45)
+    shifts = np.where(valid, A - 1, 0).astype(np.uint64)
+    bits = np.where(valid, np.left_shift(np.uint64(1), shifts), np.uint64(0))
+    return np.bitwise_or.reduce(bits, axis=1).astype(np.uint64)
+
+
+def presence_array(presence: pd.DataFrame) -> np.ndarray:
+    """presence_matrix 결과의 번호 열(1~45)만 (D, 45) int8 열 우선(F) 배열로.
+
+    cooccurrence/correlation 에 DataFrame 대신 넘기면 열 선택·블록 통합을 매번 거치지 않음.
+    """
+    return np.asfortranarray(presence[[str(i) for i in range(1, 46)]].to_numpy(dtype=np.int8, copy=True))
+
+
+def _cooccurrence_counts(X: np.ndarray, order: str = "F") -> np.ndarray:
+    # 정수 matmul은 BLAS를 타지 않으므로 float32 sgemm 사용.
+    # 0/1 합이라 회차 수 < 2^24 범위에서 float32도 정확함.
+    # 어차피 형변환 복사가 일어나므로 열 우선(F) 배치로 받아 X.T가 연속 메모리가 되게 함.
+    # (행 우선으로 막 만든 배열은 order="C" — 전치 복사보다 sgemm 전치 플래그가 쌈)
+    Xf = np.asarray(X, dtype=np.float32, order=order)
+    co = (Xf.T @ Xf).astype(np.int64)
     np.fill_diagonal(co, 0)
-    return pd.DataFrame(co, index=only_num.columns, columns=only_num.columns, dtype=int)
+    return co
+
+
+def _presence_labels(only_num) -> List[str]:
+    if isinstance(only_num, pd.DataFrame):
+        return list(only_num.columns)
+    return [str(i) for i in range(1, 46)]
+
+
+def cooccurrence(only_num: pd.DataFrame | np.ndarray) -> pd.DataFrame:
+    """only_num: presence의 번호 열 DataFrame 또는 presence_array 결과."""
+    labels = _presence_labels(only_num)
+    co = _cooccurrence_counts(np.asarray(only_num, dtype=np.int8))
+    return pd.DataFrame(co, index=labels, columns=labels, dtype=int)
+
+
+def correlation(only_num: pd.DataFrame | np.ndarray, co: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """0/1 출현 행렬의 Pearson 상관 (only_num.corr()와 같은 값, NumPy 직접 계산).
+
+    co에 cooccurrence 결과를 넘기면 X.T @ X를 다시 계산하지 않고 재사용
+    (대각은 0으로 비워져 있으므로 열 합으로 복원).
+    분산 0(항상/전혀 안 나온 번호)인 행·열은 NaN 대신 0 — 히트맵/클러스터링이 깨지지 않도록.
+    """
+    X = np.asarray(only_num, dtype=np.int8)
+    n = X.shape[0]
+    s = X.sum(axis=0, dtype=np.int64)
+    G = _cooccurrence_counts(X) if co is None else co.to_numpy(dtype=np.int64)
+    G = G.astype(np.float64)
+    np.fill_diagonal(G, s)  # 0/1 이므로 x·x = x
+    mu = s / n if n else np.zeros(len(s))
+    cov = G / max(n, 1) - np.outer(mu, mu)
+    var = np.diag(cov).copy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        C = cov / np.sqrt(np.outer(var, var))
+    C[var <= 0, :] = 0.0
+    C[:, var <= 0] = 0.0
+    np.fill_diagonal(C, np.where(var > 0, 1.0, 0.0))
+    labels = _presence_labels(only_num)
+    return pd.DataFrame(C, index=labels, columns=labels)
+
+
+def cooccurrence_bitpacked(bits: np.ndarray) -> pd.DataFrame:
+    """presence_bits 결과로 공출현 행렬 계산 (cooccurrence와 동일한 라벨/값)."""
+    # 리틀엔디언 바이트 뷰를 unpackbits → (D, 45) uint8 (uint64 시프트 전개는 셀당 8바이트)
+    bits = np.ascontiguousarray(bits, dtype="<u8")
+    X = np.unpackbits(bits.view(np.uint8).reshape(-1, 8), axis=1, count=45, bitorder="little")
+    labels = _presence_labels(X)
+    return pd.DataFrame(_cooccurrence_counts(X, order="C"), index=labels, columns=labels, dtype=int)
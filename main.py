@@ -1,19 +1,21 @@
 # app.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import os, re, hashlib, datetime, requests
+import os, re, csv, hashlib, datetime, threading, requests
+from itertools import combinations
 import numpy as np, pandas as pd, streamlit as st, plotly.express as px
+import plotly.graph_objects as go
 
-from lotto_data import load_csv, frequency, presence_matrix, cooccurrence, incremental_update
+from lotto_data import load_csv, frequency, presence_matrix, presence_array, cooccurrence, correlation, incremental_update
 from rolling import rolling_frequency
 from recs import (
-    recommend_hot, recommend_cold, recommend_balanced, recommend_weighted_recent,
+    recommend_hot, recommend_cold, recommend_balanced, recommend_weighted_recent, freq_order_desc,
     composition_metrics, bonus_candidates
 )
 from features import build_features, last_digit_hist
 from fairness import chi_square_uniform, pair_significance_binomial
 from viz import (
-    apply_global_style, kpi_card,
+    apply_global_style, kpi_row,
     make_top_frequency_vertical, make_heatmap, make_corr_heatmap_pro, make_top_pairs_vertical
 )
 
@@ -56,36 +58,88 @@ def _ensure_dirs():
     os.makedirs(os.path.dirname(DATA_CSV) or ".", exist_ok=True)
     os.makedirs(os.path.dirname(MEMBERS_CSV) or ".", exist_ok=True)
 
+MEMBER_COLS = ["created_at", "name", "phone_e164"]
+
 def _load_members_csv() -> pd.DataFrame:
     _ensure_dirs()
     if not os.path.exists(MEMBERS_CSV):
-        cols = ["created_at", "name", "phone_e164"]
-        return pd.DataFrame(columns=cols)
-    return pd.read_csv(MEMBERS_CSV, dtype=str)
+        return pd.DataFrame(columns=MEMBER_COLS)
+    df = pd.read_csv(MEMBERS_CSV, dtype=str)
+    if "phone_e164" in df.columns:
+        # 수동 편집/구버전 행도 신규 가입과 같은 형식으로 맞춰 존재 여부 비교가 일치하도록
+        df["phone_e164"] = _normalize_e164_vec(df["phone_e164"])
+    return df
+
+def _members_file_key() -> tuple:
+    """회원 CSV 변경 감지용 (mtime_ns, size). 파일이 없으면 (0, 0)."""
+    try:
+        info = os.stat(MEMBERS_CSV)
+        return (info.st_mtime_ns, info.st_size)
+    except OSError:
+        return (0, 0)
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _csv_bytes(_df: pd.DataFrame, cache_key) -> bytes:
+    # 다운로드 버튼용 인코딩 결과 캐시 — _df는 해시하지 않고 cache_key로만 구분 (최신 스냅샷 1개만 유지)
+    return _df.to_csv(index=False).encode("utf-8-sig")
 
 def _save_members_csv(df: pd.DataFrame):
     _ensure_dirs()
     df.to_csv(MEMBERS_CSV, index=False, encoding="utf-8-sig")
 
+def _append_member_row(row: list):
+    """회원 CSV에 한 줄만 추가 (전체 재작성 X). 새 파일이면 BOM+헤더부터."""
+    _ensure_dirs()
+    new_file = not os.path.exists(MEMBERS_CSV) or os.path.getsize(MEMBERS_CSV) == 0
+    # utf-8-sig로 append하면 중간에 BOM이 또 들어가므로 새 파일일 때만 사용
+    with open(MEMBERS_CSV, "a", encoding="utf-8-sig" if new_file else "utf-8", newline="") as f:
+        w = csv.writer(f, lineterminator="\n")  # to_csv와 같은 줄바꿈
+        if new_file:
+            w.writerow(MEMBER_COLS)
+        w.writerow(row)
+
+_NONDIGIT = re.compile(r"\D")
+
 def _normalize_e164(phone: str) -> str:
     """
     010-1234-5678 / 01012345678 / +82 10 1234 5678 등 → +821012345678
     (숫자 이외 제거 후 한국 가정)
     """
-    p = re.sub(r"\D", "", phone or "")
+    p = _NONDIGIT.sub("", phone or "")
     if not p:
         return ""
-    if p.startswith("0"):
+    elif p.startswith("0"):
         return "+82" + p[1:]
-    if p.startswith("82"):
+    elif p.startswith("82"):
         return "+" + p
-    if phone.strip().startswith("+"):
+    elif phone.strip().startswith("+"):
         return phone.strip()
-    return "+82" + p  # 그 외도 한국 기본
+    else:
+        return "+82" + p  # 그 외도 한국 기본
+
+def _normalize_e164_vec(phones: pd.Series) -> pd.Series:
+    """_normalize_e164의 벡터화 버전 (회원 CSV 일괄 처리용, 규칙 동일)."""
+    raw = phones.fillna("").astype(str)
+    p = raw.str.replace(_NONDIGIT, "", regex=True)
+    stripped = raw.str.strip()
+    out = np.select(
+        [p == "", p.str.startswith("0"), p.str.startswith("82"), stripped.str.startswith("+")],
+        ["", "+82" + p.str[1:], "+" + p, stripped],
+        default="+82" + p,
+    )
+    return pd.Series(out, index=phones.index, dtype=object)
 
 def _phone_hash(phone_e164: str) -> str:
     return hashlib.sha256((phone_e164 or "").encode("utf-8")).hexdigest()
 
+# 회원 CSV 일괄 해시용: 행마다 Series.apply를 거치지 않고 ndarray에 바로 ufunc 적용
+# (외부 연동 값과 맞춰야 하므로 알고리즘은 sha256 그대로 유지)
+_phone_hash_ufunc = np.frompyfunc(_phone_hash, 1, 1)
+
+def _phone_hash_batch(phones: pd.Series) -> pd.Series:
+    vals = phones.fillna("").astype(str).to_numpy(dtype=object)
+    return pd.Series(_phone_hash_ufunc(vals), index=phones.index, dtype=object)
+
 def _supabase_enabled() -> bool:
     try:
         _ = st.secrets["supabase"]["url"]
@@ -94,6 +148,11 @@ def _supabase_enabled() -> bool:
     except Exception:
         return False
 
+@st.cache_resource
+def _http_session():
+    # Supabase upsert 전용: 세션(스레드) 간 공유는 커넥션 풀링 목적뿐
+    return requests.Session()
+
 def _supabase_upsert_member(name: str, phone_e164: str) -> bool:
     try:
         url = st.secrets["supabase"]["url"].rstrip("/") + "/rest/v1/members"
@@ -105,10 +164,11 @@ def _supabase_upsert_member(name: str, phone_e164: str) -> bool:
             "Prefer": "resolution=merge-duplicates,return=representation"
         }
         payload = {"name": name, "phone_e164": phone_e164}
-        r = requests.post(url, headers=headers, json=payload, timeout=12)
+        session = _http_session()
+        r = session.post(url, headers=headers, json=payload, timeout=12)
         if r.status_code not in (200, 201):
             if r.status_code == 409:
-                r2 = requests.patch(url + f"?phone_e164=eq.{phone_e164}", headers=headers, json=payload, timeout=12)
+                r2 = session.patch(url + f"?phone_e164=eq.{phone_e164}", headers=headers, json=payload, timeout=12)
                 r2.raise_for_status()
             else:
                 r.raise_for_status()
@@ -117,6 +177,28 @@ def _supabase_upsert_member(name: str, phone_e164: str) -> bool:
         st.info(f"Supabase 저장 건너뜀: {e}")
         return False
 
+@st.cache_resource
+def _member_index() -> dict:
+    """가입 여부 확인용 전화번호 해시 집합 (세션 간 공유, 최초 1회만 CSV 로드).
+
+    CSV를 직접 고치거나 중복 정리한 뒤에는 _member_index.clear()로 다시 만든다.
+    """
+    df = _load_members_csv()
+    hashes = set(_phone_hash_batch(df["phone_e164"])) if not df.empty else set()
+    return {"hashes": hashes, "lock": threading.Lock()}
+
+def _dedupe_members_csv() -> int:
+    """phone_e164 기준 중복 행 정리 (먼저 가입한 행 유지). 제거된 행 수 반환."""
+    idx = _member_index()
+    with idx["lock"]:
+        df = _load_members_csv()
+        deduped = df.drop_duplicates(subset=["phone_e164"], keep="first")
+        removed = len(df) - len(deduped)
+        if removed:
+            _save_members_csv(deduped)
+    _member_index.clear()
+    return removed
+
 def register_or_login(name: str, phone: str) -> tuple[bool, str]:
     """
     이름/전화로 간편 가입+로그인.
@@ -130,19 +212,16 @@ def register_or_login(name: str, phone: str) -> tuple[bool, str]:
     if not phone_e164:
         return False, "전화번호를 정확히 입력해주세요."
 
-    df = _load_members_csv()
-    exists = False if df.empty else phone_e164 in set(df["phone_e164"])
+    idx = _member_index()
+    h = _phone_hash(phone_e164)
+    with idx["lock"]:
+        exists = h in idx["hashes"]
+        if not exists:
+            # 한 줄 append — 중복 정리는 관리자 탭에서 필요할 때만
+            _append_member_row([datetime.datetime.utcnow().isoformat(), name, phone_e164])
+            idx["hashes"].add(h)
 
     if not exists:
-        row = pd.DataFrame([{
-            "created_at": datetime.datetime.utcnow().isoformat(),
-            "name": name,
-            "phone_e164": phone_e164
-        }])
-        df = pd.concat([df, row], ignore_index=True)
-        df = df.drop_duplicates(subset=["phone_e164"], keep="first")
-        _save_members_csv(df)
-
         # supabase 업서트도 phone_e164 그대로
         if _supabase_enabled():
             _supabase_upsert_member(name, phone_e164)
@@ -238,21 +317,74 @@ if df.empty:
 latest = int(df["draw_no"].max())
 
 # KPI
-c1, c2, c3, c4 = st.columns([1.1, 1.1, 2.4, 1.1])
-with c1: kpi_card("수집 회차", f"{len(df):,}")
-with c2: kpi_card("최신 회차", f"{latest:,}")
-with c3: kpi_card("기간", f"{df['date'].min()} → {df['date'].max()}")
-with c4: kpi_card("보너스 포함", "Yes" if INCLUDE_BONUS else "No")
+kpi_row([
+    ("수집 회차", f"{len(df):,}", None),
+    ("최신 회차", f"{latest:,}", None),
+    ("기간", f"{df['date'].min()} → {df['date'].max()}", None),
+    ("보너스 포함", "Yes" if INCLUDE_BONUS else "No", None),
+], widths=[1.1, 1.1, 2.4, 1.1])
 
 st.title("🎯 Lotto 6/45 Analyzer — Pro")
 # =========================
 # 4) 핵심 계산
 # =========================
-freq = frequency(df, include_bonus=INCLUDE_BONUS)
-presence = presence_matrix(df, include_bonus=INCLUDE_BONUS)
-only_num = presence[[str(i) for i in range(1, 46)]]
-co_df = cooccurrence(only_num)
-corr = only_num.corr(method="pearson")
+# 재실행(위젯 토글 등)마다 재계산하지 않도록 캐시.
+# DataFrame 전체 해시 대신 (회차 수, 최신 회차, 보너스 여부)로 키잉 — 인자 앞 '_'는 해시 제외.
+@st.cache_data(show_spinner=False)
+def _cached_frequency(_df: pd.DataFrame, n_rows: int, latest_draw: int, include_bonus: bool) -> pd.Series:
+    return frequency(_df, include_bonus=include_bonus)
+
+@st.cache_data(show_spinner=False)
+def _cached_presence(_df: pd.DataFrame, n_rows: int, latest_draw: int, include_bonus: bool) -> pd.DataFrame:
+    return presence_matrix(_df, include_bonus=include_bonus)
+
+@st.cache_data(show_spinner=False)
+def _cached_presence_array(_presence: pd.DataFrame, n_rows: int, latest_draw: int, include_bonus: bool) -> np.ndarray:
+    # (D, 45) int8 F-연속 — 공출현/상관 커널 입력용
+    return presence_array(_presence)
+
+@st.cache_data(show_spinner=False)
+def _cached_cooccurrence(_P: np.ndarray, n_rows: int, latest_draw: int, include_bonus: bool) -> pd.DataFrame:
+    return cooccurrence(_P)
+
+@st.cache_data(show_spinner=False)
+def _cached_corr(_P: np.ndarray, _co_df: pd.DataFrame,
+                 n_rows: int, latest_draw: int, include_bonus: bool) -> pd.DataFrame:
+    # Pearson 상관: 이미 계산된 공출현(X.T @ X)을 재사용
+    return correlation(_P, co=_co_df)
+
+@st.cache_data(show_spinner=False)
+def _cached_pair_significance(_co_df: pd.DataFrame, n_rows: int, latest_draw: int, include_bonus: bool,
+                              alpha: float = 0.05) -> pd.DataFrame:
+    return pair_significance_binomial(_co_df, n_draws=n_rows, include_bonus=include_bonus, alpha=alpha)
+
+@st.cache_data(show_spinner=False)
+def _cached_features(_df: pd.DataFrame, n_rows: int, latest_draw: int) -> pd.DataFrame:
+    return build_features(_df)
+
+@st.cache_data(show_spinner=False)
+def _cached_last_digit_hist(_df: pd.DataFrame, n_rows: int, latest_draw: int) -> pd.Series:
+    return last_digit_hist(_df)
+
+def _hist_bar(values: np.ndarray, bins: int, title: str, x_title: str) -> go.Figure:
+    # 원본 배열 대신 서버에서 구간화한 막대만 전송 (px.histogram은 전 회차 값을 그대로 싣고 브라우저가 구간화)
+    counts, edges = np.histogram(values, bins=bins)
+    bounds = np.column_stack([edges[:-1], edges[1:]])
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), customdata=bounds,
+        hovertemplate="%{customdata[0]:.0f}–%{customdata[1]:.0f}<br>count=%{y}<extra></extra>",
+    ))
+    fig.update_layout(title=title, bargap=0, xaxis_title=x_title, yaxis_title="count")
+    return fig
+
+_data_key = (len(df), latest, INCLUDE_BONUS)
+freq = _cached_frequency(df, *_data_key)
+presence = _cached_presence(df, *_data_key)
+P = _cached_presence_array(presence, *_data_key)
+co_df = _cached_cooccurrence(P, *_data_key)
+# 공출현 히트맵 색상 상한(99% 분위) — 추천/비교 탭에서 공통 사용
+_co_vmax = float(np.quantile(co_df.values, 0.99))
+corr = _cached_corr(P, co_df, *_data_key)
 
 # =========================
 # 5) 관리자 여부 판별
@@ -281,9 +413,10 @@ with tab_reco:
     signin_block()  # 상단 로그인 박스
 
     nums_all = list(range(1, 46))
-    hot_set = recommend_hot(freq)
-    cold_set = recommend_cold(freq)
-    bal_set = recommend_balanced(freq)
+    _order_desc = freq_order_desc(freq)
+    hot_set = recommend_hot(freq, order_desc=_order_desc)
+    cold_set = recommend_cold(freq, order_desc=_order_desc)
+    bal_set = recommend_balanced(freq, order_desc=_order_desc)
     ai_set = recommend_weighted_recent(df, lookback=LOOKBACK, include_bonus=INCLUDE_BONUS)
 
     sets = [
@@ -294,9 +427,25 @@ with tab_reco:
     ]
     bonus_cands = bonus_candidates(df, lookback=LOOKBACK, topk=5) if INCLUDE_BONUS else []
     R = rolling_frequency(df, window=LOOKBACK, include_bonus=INCLUDE_BONUS)
+    # 세트별 열 선택은 pandas 인덱서 대신 ndarray에서 위치로 (열은 1~45 오름차순)
+    R_np, R_cols = R.to_numpy(), R.columns.to_numpy()
 
     logged = st.session_state.get("logged_in", False)
 
+    # 세트 공통 베이스 figure는 한 번만 생성하고, 세트마다 복사 후 강조색/선택쌍만 갱신
+    fig_freq_base = px.bar(
+        x=[str(i) for i in nums_all],
+        y=freq.reindex(nums_all, fill_value=0).astype(int).to_numpy(),
+        title="전체 빈도",
+    )
+    fig_freq_base.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)",
+                                plot_bgcolor="rgba(0,0,0,0)", height=320,
+                                margin=dict(l=10, r=10, t=50, b=10),
+                                xaxis_title="번호", yaxis_title="빈도",
+                                title_font=dict(size=20, color="#E5E7EB"))
+    fig_co_base = make_heatmap(co_df, title="공출현 히트맵 + 선택쌍",
+                               zmin=0, zmax=_co_vmax, colorscale="YlGnBu", height=320)
+
     for idx, (title, picked, subtitle) in enumerate(sets):
         with st.container(border=True):
             cA, cB = st.columns([1, 3], gap="large")
@@ -328,35 +477,23 @@ with tab_reco:
                     # 빈도 막대(선택번호 강조)
                     colors = ["#334155"] * 45
                     for n in picked: colors[n - 1] = "#3B82F6"
-                    fig_freq = px.bar(
-                        x=[str(i) for i in nums_all],
-                        y=[int(freq.get(i, 0)) for i in nums_all],
-                        title="전체 빈도",
-                    )
+                    fig_freq = go.Figure(fig_freq_base)
                     fig_freq.update_traces(marker_color=colors)
-                    fig_freq.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)",
-                                           plot_bgcolor="rgba(0,0,0,0)", height=320,
-                                           margin=dict(l=10, r=10, t=50, b=10),
-                                           xaxis_title="번호", yaxis_title="빈도",
-                                           title_font=dict(size=20, color="#E5E7EB"))
                     c1.plotly_chart(fig_freq, use_container_width=True)
 
                     # 공출현 히트맵 + 선택쌍
-                    vmax = float(np.quantile(co_df.values, 0.99))
-                    fig_co2 = make_heatmap(co_df, title="공출현 히트맵 + 선택쌍",
-                                           zmin=0, zmax=vmax, colorscale="YlGnBu", height=320)
+                    fig_co2 = go.Figure(fig_co_base)
                     xs, ys = [], []
-                    for i in range(len(picked)):
-                        for j in range(i + 1, len(picked)):
-                            a, b = picked[i], picked[j]
-                            xs += [f"{a:02d}", f"{b:02d}"]; ys += [f"{b:02d}", f"{a:02d}"]
+                    for a, b in combinations([f"{n:02d}" for n in picked], 2):
+                        xs += [a, b]; ys += [b, a]
                     if xs:
                         fig_co2.add_scatter(x=xs, y=ys, mode="markers",
                                             marker=dict(size=10, color="#EF4444"), name="선택쌍")
                     c2.plotly_chart(fig_co2, use_container_width=True)
 
                     # 롤링 빈도(선택 번호만)
-                    subR = R[[n for n in picked]]
+                    pos = np.searchsorted(R_cols, picked)
+                    subR = pd.DataFrame(R_np[:, pos], index=R.index, columns=R.columns[pos])
                     fig_roll = px.line(subR, title=f"최근 {LOOKBACK}회 롤링 빈도",
                                        labels={"index": "회차(draw_no)", "value": "빈도(창 내)"})
                     fig_roll.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)",
@@ -382,16 +519,16 @@ with tab_comp:
             fig_freq_top = make_top_frequency_vertical(freq, topn=TOPN, title=top_title, compact=COMPACT)
             st.plotly_chart(fig_freq_top, use_container_width=True)
         with r1c2:
-            sig_pairs = pair_significance_binomial(co_df, n_draws=len(presence), include_bonus=INCLUDE_BONUS, alpha=0.05)
-            top_pairs = sig_pairs.sort_values("co_count", ascending=False).head(TOPN)
+            sig_pairs = _cached_pair_significance(co_df, *_data_key, alpha=0.05)
+            # 990쌍 전체 정렬 대신 부분 선택 (동률은 유의성 정렬 순서 유지)
+            top_pairs = sig_pairs.nlargest(TOPN, "co_count")
             fig_tp = make_top_pairs_vertical(top_pairs, title=f"Top {TOPN} Co-occurring Pairs (붉은색=FDR 유의)", compact=COMPACT)
             st.plotly_chart(fig_tp, use_container_width=True)
 
         r2c1, r2c2 = st.columns(2, gap="large")
         with r2c1:
-            vmax = float(np.quantile(co_df.values, 0.99))
             fig_co = make_heatmap(co_df, title=f"Pair Co-occurrence Heatmap — {'Bonus Included' if INCLUDE_BONUS else 'Bonus Excluded'}",
-                                  zmin=0, zmax=vmax, colorscale="YlGnBu", compact=COMPACT)
+                                  zmin=0, zmax=_co_vmax, colorscale="YlGnBu", compact=COMPACT)
             st.plotly_chart(fig_co, use_container_width=True)
         with r2c2:
             fig_corr = make_corr_heatmap_pro(
@@ -402,14 +539,14 @@ with tab_comp:
 
         st.markdown("---")
         st.subheader("구성 분석 — 홀짝·끝자리·연속수·합계·범위")
-        feats = build_features(df)
+        feats = _cached_features(df, len(df), latest)
         c1, c2, c3 = st.columns(3)
-        fig_sum = px.histogram(feats, x="sum", nbins=30, title="합계 분포")
+        fig_sum = _hist_bar(feats["sum"].to_numpy(), 30, "합계 분포", "sum")
         fig_sum.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
                               height=320, title_font=dict(size=20, color="#E5E7EB"))
         c1.plotly_chart(fig_sum, use_container_width=True)
 
-        fig_rng = px.histogram(feats, x="range", nbins=25, title="범위(최대-최소) 분포")
+        fig_rng = _hist_bar(feats["range"].to_numpy(), 25, "범위(최대-최소) 분포", "range")
         fig_rng.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
                               height=320, title_font=dict(size=20, color="#E5E7EB"))
         c2.plotly_chart(fig_rng, use_container_width=True)
@@ -421,7 +558,7 @@ with tab_comp:
         c3.plotly_chart(fig_odd, use_container_width=True)
 
         st.markdown("**끝자리(Last digit) 분포**")
-        ld = last_digit_hist(df)
+        ld = _cached_last_digit_hist(df, len(df), latest)
         fig_ld = px.bar(x=[str(i) for i in ld.index], y=ld.values, title="끝자리 분포(0~9)")
         fig_ld.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
                              height=360, xaxis_title="끝자리", yaxis_title="빈도", title_font=dict(size=20, color="#E5E7EB"))
@@ -444,8 +581,7 @@ with tab_fair:
         with cfa: st.metric("χ² 통계량", f"{chi['stat']:.2f}")
         with cfb: st.metric("p-value", f"{chi['pvalue']:.4f}")
 
-        n_draws = len(presence)
-        sig_pairs = pair_significance_binomial(co_df, n_draws=n_draws, include_bonus=INCLUDE_BONUS, alpha=0.05)
+        sig_pairs = _cached_pair_significance(co_df, *_data_key, alpha=0.05)
         st.markdown("**쌍 과대표현(상향) FDR 보정 결과 (상위 50 표시)**")
         st.dataframe(sig_pairs.head(50), use_container_width=True, height=500)
         st.caption("모형: 45개 중 6(또는 7)개 무작위 추출 가정. Binomial 상향 단측, FDR 보정(BH).")
@@ -453,14 +589,22 @@ with tab_fair:
 # -------------------------
 # 6-4) 회원 관리 탭 (관리자만 존재)
 # -------------------------
+# 탭 안의 버튼(중복 정리/다운로드)은 이 패널만 다시 실행 — 분석 탭 차트 전체를 재계산·재전송하지 않음
+@st.fragment
+def _members_admin_panel():
+    st.subheader("👥 회원 관리 (관리자 전용)")
+    if st.button("🧹 중복 회원 정리"):
+        removed = _dedupe_members_csv()
+        st.success(f"중복 {removed}건 정리 완료" if removed else "중복 없음")
+    mdf = _load_members_csv()
+    st.dataframe(mdf, use_container_width=True, height=520)
+    st.download_button("⬇️ 회원 CSV 다운로드",
+                       data=_csv_bytes(mdf, ("members",) + _members_file_key()),
+                       file_name="members.csv",
+                       mime="text/csv")
+    st.caption("※ 전화번호는 해시 및 E.164 형식으로 저장됩니다. 실제 운영 시 보관기간/파기정책을 고지하세요.")
+
 if is_admin:
     with tab_admin:
-        st.subheader("👥 회원 관리 (관리자 전용)")
-        mdf = _load_members_csv()
-        st.dataframe(mdf, use_container_width=True, height=520)
-        st.download_button("⬇️ 회원 CSV 다운로드",
-                           data=mdf.to_csv(index=False).encode("utf-8-sig"),
-                           file_name="members.csv",
-                           mime="text/csv")
-        st.caption("※ 전화번호는 해시 및 E.164 형식으로 저장됩니다. 실제 운영 시 보관기간/파기정책을 고지하세요.")
+        _members_admin_panel()
 
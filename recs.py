@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import random
-from collections import Counter
 from typing import List, Dict
 import numpy as np, pandas as pd
 
@@ -13,14 +12,27 @@ def _pick_k(sorted_nums: List[int], k: int = 6) -> List[int]:
     rest = [n for n in range(1,46) if n not in uniq]
     return sorted(uniq + random.sample(rest, k - len(uniq)))
 
-def recommend_hot(freq: pd.Series, k: int = 6) -> List[int]:
-    return _pick_k(freq.sort_values(ascending=False).index.tolist(), k)
+def freq_order_desc(freq: pd.Series) -> np.ndarray:
+    """빈도 내림차순 위치 인덱스 (동률은 앞 번호 우선). 한 번 계산해 hot/cold/balanced에 공유."""
+    return np.argsort(-freq.to_numpy(), kind="stable")
 
-def recommend_cold(freq: pd.Series, k: int = 6) -> List[int]:
-    return _pick_k(freq.sort_values(ascending=True).index.tolist(), k)
+def _nums_by_order(freq: pd.Series, order: np.ndarray) -> List[int]:
+    return freq.index.to_numpy()[order].tolist()
 
-def recommend_balanced(freq: pd.Series, k: int = 6) -> List[int]:
-    nums_sorted = freq.sort_values(ascending=False).index.tolist()
+def recommend_hot(freq: pd.Series, k: int = 6, order_desc: np.ndarray | None = None) -> List[int]:
+    if order_desc is None:
+        order_desc = freq_order_desc(freq)
+    return _pick_k(_nums_by_order(freq, order_desc), k)
+
+def recommend_cold(freq: pd.Series, k: int = 6, order_desc: np.ndarray | None = None) -> List[int]:
+    if order_desc is None:
+        order_desc = freq_order_desc(freq)
+    return _pick_k(_nums_by_order(freq, order_desc[::-1]), k)
+
+def recommend_balanced(freq: pd.Series, k: int = 6, order_desc: np.ndarray | None = None) -> List[int]:
+    if order_desc is None:
+        order_desc = freq_order_desc(freq)
+    nums_sorted = _nums_by_order(freq, order_desc)
     pick: List[int] = []
     target_odd, target_low = 3, 3
     def ok_add(n: int) -> bool:
@@ -43,11 +55,8 @@ def recommend_weighted_recent(df: pd.DataFrame, lookback: int = 200, k: int = 6,
     rng = np.random.default_rng(seed)
     hist = df.tail(lookback)
     cols = ["n1","n2","n3","n4","n5","n6"] + (["bonus"] if include_bonus else [])
-    w = Counter()
-    for _, r in hist.iterrows():
-        for c in cols: w[int(r[c])] += 1
-    weights = np.array([w[n] for n in range(1,46)], dtype=float)
-    weights = (weights + 1.0)
+    arr = hist[cols].to_numpy(dtype=np.int64).ravel()
+    weights = np.bincount(arr, minlength=46)[1:46].astype(float) + 1.0
     probs = weights / weights.sum()
     picks = rng.choice(np.arange(1,46), size=45, replace=False, p=probs)
     return sorted(list(picks[:k]))
@@ -65,5 +74,8 @@ def composition_metrics(nums: List[int]) -> Dict[str, int|bool|list]:
 
 def bonus_candidates(df: pd.DataFrame, lookback: int = 200, topk: int = 5) -> List[int]:
     hist = df.tail(lookback)
-    s = hist["bonus"].value_counts().sort_values(ascending=False)
-    return s.index.astype(int).tolist()[:topk]
+    vals = hist["bonus"].dropna().to_numpy(dtype=np.int64)
+    cnt = np.bincount(vals, minlength=46)
+    order = np.argsort(-cnt, kind="stable")
+    order = order[cnt[order] > 0]  # value_counts처럼 실제 나온 번호만
+    return order[:topk].tolist()
@@ -1,17 +1,19 @@
 # rolling.py
 # -*- coding: utf-8 -*-
+import numpy as np
 import pandas as pd
 
 def rolling_frequency(df: pd.DataFrame, window: int = 100, include_bonus: bool = False) -> pd.DataFrame:
     cols = ["n1","n2","n3","n4","n5","n6"] + (["bonus"] if include_bonus else [])
     idx = pd.Index(range(1,46), name="number")
-    out = []
-    for i in range(len(df)):
-        lo = max(0, i - window + 1)
-        sub = df.iloc[lo:i+1]
-        s = pd.Series(0, index=idx)
-        for c in cols:
-            s = s.add(sub[c].value_counts().reindex(idx, fill_value=0), fill_value=0)
-        out.append(s)
-    R = pd.DataFrame(out, index=df["draw_no"].values)
+    D = len(df)
+    # 회차별 번호 출현 수 (D, 45) → 누적합 차분으로 창(window) 합계를 한 번에 계산
+    A = df[cols].to_numpy(dtype=np.int64, na_value=0)  # 결측은 0 → valid에서 제외
+    valid = (A >= 1) & (A <= 45)
+    flat = (np.arange(D)[:, None] * 45 + (A - 1))[valid]
+    M = np.bincount(flat, minlength=D * 45).reshape(D, 45)
+    C0 = np.vstack([np.zeros((1, 45), dtype=M.dtype), M.cumsum(axis=0)])
+    lo = np.maximum(0, np.arange(D) - window + 1)
+    R_arr = C0[1:] - C0[lo]
+    R = pd.DataFrame(R_arr, index=df["draw_no"].values, columns=idx)
     return R
@@ -6,9 +6,11 @@ from lotto_data import incremental_update
 def main():
     p = argparse.ArgumentParser(description="Lotto 6/45 incremental updater")
     p.add_argument("--data-path", default="data/lotto_draws.csv", help="CSV 저장 경로")
+    p.add_argument("--no-head-check", action="store_true",
+                   help="결과 페이지 Last-Modified 사전 확인 없이 항상 최신 회차 조회")
     args = p.parse_args()
     try:
-        df, prev, latest = incremental_update(args.data_path)
+        df, prev, latest = incremental_update(args.data_path, head_check=not args.no_head_check)
     except Exception as e:
         print(f"[ERROR] Update failed: {e}")
         return 2
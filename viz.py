@@ -1,16 +1,23 @@
 # viz.py
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+import hashlib
 import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
 
+try:
+    import orjson  # 선택: 빠른 Figure 직렬화 (render_fig fast 모드)
+except ImportError:
+    orjson = None
+
 PRIMARY = "#1F3A8A"
 
 # -------- 공통 스타일 --------
-def apply_global_style():
-    st.markdown("""
+# 재실행마다 문자열을 다시 만들지 않도록 모듈 상수로.
+# 주의: Streamlit은 재실행에서 다시 그리지 않은 요소를 지우므로 세션당 1회만 주입하면 스타일이 사라짐 → 매 실행 호출.
+_GLOBAL_CSS = """
     <style>
       :root { --pro-font: "Noto Sans KR","Segoe UI",system-ui,-apple-system,sans-serif; }
       html, body, [class^="css"] { font-family: var(--pro-font); }
@@ -21,120 +28,244 @@ def apply_global_style():
       .metric-title { color: #94A3B8; font-size: 12.5px; margin-bottom: 6px; }
       .metric-value { color: #E5E7EB; font-size: 22px; line-height: 1.25; word-break: keep-all; }
       .metric-subtle { color:#9CA3AF; font-size:12px; }
+      .kpi-row { display: grid; gap: 1rem; margin-bottom: 1rem; }
+      @media (max-width: 640px) { .kpi-row { grid-template-columns: 1fr !important; } }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def apply_global_style():
+    st.markdown(_GLOBAL_CSS, unsafe_allow_html=True)
+
+def _kpi_html(title: str, value: str, sub: str | None = None) -> str:
+    # 한 줄 HTML: 여러 카드를 이어 붙여도 빈 줄/들여쓰기 때문에 markdown 코드블록으로 깨지지 않도록
+    sub_html = f'<div class="metric-subtle">{sub}</div>' if sub else ""
+    return (f'<div class="metric-pro"><div class="metric-title">{title}</div>'
+            f'<div class="metric-value">{value}</div>{sub_html}</div>')
 
 def kpi_card(title: str, value: str, sub: str | None = None):
-    with st.container():
-        st.markdown(f"""
-        <div class="metric-pro">
-          <div class="metric-title">{title}</div>
-          <div class="metric-value">{value}</div>
-          {f'<div class="metric-subtle">{sub}</div>' if sub else ''}
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(_kpi_html(title, value, sub), unsafe_allow_html=True)
+
+def kpi_row(cards: list[tuple[str, str, str | None]], widths: list[float] | None = None):
+    """
+    KPI 카드 여러 개를 CSS grid 한 줄로 — st.columns + 카드별 st.markdown 대신 markdown 1회.
+    cards: (title, value, sub) 목록, widths: 열 비율 (st.columns와 같은 의미, 기본 균등)
+    """
+    widths = widths or [1.0] * len(cards)
+    cols = " ".join(f"{w}fr" for w in widths)
+    body = "".join(_kpi_html(*c) for c in cards)
+    st.markdown(f'<div class="kpi-row" style="grid-template-columns: {cols};">{body}</div>',
+                unsafe_allow_html=True)
 
+# make_* 는 st.cache_data로 메모이즈: 같은 입력(DataFrame/Series는 Streamlit이 내용 해시)이면
+# Figure 생성·검증을 건너뛰고 사본을 돌려줌 → 호출 측에서 update_layout 등으로 고쳐도 캐시는 안전.
+# 차트 옵션 위젯과 함께 쓰는 경우 호출 측에서 위젯+make_*+st.plotly_chart를 @st.fragment 함수로 묶으면
+# 위젯 변경 시 그 블록만 재실행됨 (페이지 전체 재실행/다른 차트 재전송 없음).
 def _scale(h: int, compact: bool) -> int:
     return int(h * (0.72 if compact else 1.0))
 
+# go.Bar/go.Heatmap 키워드 생성 + update_layout 대신 dict 하나로 Figure를 만들어 검증을 한 번만 거침.
+# 다크 테마 공통 레이아웃은 모듈 상수로 (호출마다 다시 만들지 않음).
+_BASE_LAYOUT = {
+    "template": "plotly_dark",
+    "paper_bgcolor": "rgba(0,0,0,0)",
+    "plot_bgcolor": "rgba(0,0,0,0)",
+}
+_TITLE_FONT = {"size": 18, "color": "#E5E7EB"}
+# 차트 공통 상수 (Plotly가 Figure 생성 시 값을 복사하므로 공유해도 안전)
+_MARGIN_BAR = dict(l=10, r=10, t=50, b=10)
+_MARGIN_BAR_H = dict(l=10, r=20, t=50, b=12)
+_MARGIN_HEATMAP = dict(l=8, r=8, t=46, b=8)
+_TICKFONT = dict(size=11)
+_TICKFONT_SMALL = dict(size=9)
+_GRID = "rgba(148,163,184,.22)"
+_COLOR_ACCENT = "#3B82F6"  # 상위 5개 / 일반 쌍
+_COLOR_BASE = "#60A5FA"
+_COLOR_SIG = "#EF4444"     # FDR 유의 쌍
+_LABELS_01_45 = tuple(f"{i:02d}" for i in range(1, 46))
+
+# 막대가 이보다 많으면 SVG 막대 대신 WebGL 마커 (DOM이 막대 수만큼 커지는 것 방지)
+_GL_BAR_THRESHOLD = 80
+# 막대 폭에 안 맞는 값 라벨은 겹쳐 그리지 않고 숨김 (라벨별 배치 계산 생략)
+_UNIFORMTEXT = {"mode": "hide", "minsize": 9}
+
+def _num_labels(n: int) -> list:
+    return list(_LABELS_01_45[:n]) if n <= 45 else [f"{i:02d}" for i in range(1, n + 1)]
+
+def _num_labels_for(nums: np.ndarray) -> list:
+    """번호 배열 → "01".."45" 라벨 (미리 만든 표에서 조회)."""
+    return [_LABELS_01_45[n - 1] if 1 <= n <= 45 else f"{n:02d}" for n in nums.tolist()]
+
+def _bar_trace(x, y, orientation: str, colors: list, hovertemplate: str) -> dict:
+    vals = x if orientation == "h" else y
+    if len(vals) > _GL_BAR_THRESHOLD:
+        # 값 라벨 없이 마커만, 값은 호버로 확인
+        return dict(type="scattergl", x=x, y=y, mode="markers",
+                    marker=dict(color=colors, size=7, line=dict(width=0)),
+                    hovertemplate=hovertemplate, showlegend=False)
+    return dict(type="bar", x=x, y=y, orientation=orientation,
+                text=[f"{v:,}" for v in vals], textposition="outside", cliponaxis=False,
+                marker=dict(color=colors, line=dict(width=0)),
+                hovertemplate=hovertemplate, showlegend=False)
+
+def _content_key(kind: str, *arrays: np.ndarray, **params) -> str:
+    """차트 데이터 배열 + 옵션으로 만든 짧은 내용 해시 (같은 차트 판별/render_fig 캐시 키용)."""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(f"{kind}|{sorted(params.items())!r}".encode("utf-8"))
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(str(a.dtype).encode("ascii"))
+        h.update(a.tobytes())
+    return f"{kind}-{h.hexdigest()}"
+
+def _figure(trace: dict, title: str, **layout) -> go.Figure:
+    return go.Figure({
+        "data": [trace],
+        "layout": {**_BASE_LAYOUT, "title": {"text": title, "font": _TITLE_FONT}, **layout},
+    })
+
 # -------- Top-N 빈도 (세로/가로) --------
-def make_top_frequency_horizontal(freq_series: pd.Series, topn: int, title: str, compact=False) -> go.Figure:
-    s_desc = freq_series.sort_values(ascending=False).head(topn)
-    top5 = set(s_desc.head(5).index)
-    s = s_desc[::-1]
-    y = [f"{i:02d}" for i in s.index]
-    x = s.values
-    colors = ["#3B82F6" if int(lbl) in top5 else "#60A5FA" for lbl in y]
-    height = _scale(max(360, 28 * len(s) + 140), compact)
-    xmax = float(max(x)) * 1.08
-    fig = go.Figure(go.Bar(
-        x=x, y=y, orientation="h",
-        text=[f"{v:,}" for v in x], textposition="outside", cliponaxis=False,
-        marker=dict(color=colors),
-        hovertemplate="번호 %{y}<br>빈도 %{x:,}회<extra></extra>",
-        showlegend=False
-    ))
-    fig.update_layout(
-        title=title, height=height, margin=dict(l=10,r=20,t=50,b=12),
-        template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
-        title_font=dict(size=18, color="#E5E7EB"),
-        xaxis=dict(title="", range=[0, xmax], showgrid=True, gridcolor="rgba(148,163,184,.22)", zeroline=False, tickfont=dict(size=11)),
-        yaxis=dict(title="", showgrid=False, tickfont=dict(size=11), categoryorder="array", categoryarray=y),
-        bargap=0.18, bargroupgap=0.06
+def _top_n(freq_series: pd.Series, topn: int) -> tuple[np.ndarray, np.ndarray]:
+    """빈도 상위 topn (번호, 값) 내림차순. 전체 정렬 대신 partition으로 k번째 값만 찾고 k개만 정렬 (동률은 앞 번호 우선)."""
+    # Plotly 검증기는 ndarray를 통째로 복사하므로 Python 리스트/Series보다 빠름 → 정수 ndarray로 고정
+    vals = freq_series.to_numpy(dtype=np.int32)
+    idx = freq_series.index.to_numpy(dtype=np.int16)
+    k = min(int(topn), vals.size)
+    if k <= 0:
+        return idx[:0], vals[:0]
+    kth = np.partition(vals, vals.size - k)[vals.size - k]  # k번째로 큰 값
+    above = np.flatnonzero(vals > kth)
+    sel = np.concatenate([above, np.flatnonzero(vals == kth)[:k - above.size]])
+    order = sel[np.lexsort((sel, -vals[sel]))]
+    return idx[order], vals[order]
+
+@st.cache_data(show_spinner=False)
+def make_top_frequency_horizontal(freq_series: pd.Series, topn: int, title: str, compact=False,
+                                  with_key: bool = False) -> go.Figure | tuple[go.Figure, str]:
+    top_idx, top_vals = _top_n(freq_series, topn)
+    # 가로 막대는 아래→위로 그려지므로 뒤집어서 1위가 맨 위에 오게
+    y = _num_labels_for(top_idx[::-1])
+    x = top_vals[::-1]
+    colors = np.where(np.arange(len(x))[::-1] < 5, _COLOR_ACCENT, _COLOR_BASE).tolist()
+    height = _scale(max(360, 28 * len(x) + 140), compact)
+    xmax = float(x.max()) * 1.08 if len(x) else 1.0
+    fig = _figure(
+        _bar_trace(x, y, "h", colors, "번호 %{y}<br>빈도 %{x:,}회<extra></extra>"),
+        title, height=height, margin=_MARGIN_BAR_H,
+        xaxis=dict(title="", range=[0, xmax], showgrid=True, gridcolor=_GRID, zeroline=False, tickfont=_TICKFONT),
+        yaxis=dict(title="", showgrid=False, tickfont=_TICKFONT, categoryorder="array", categoryarray=y),
+        bargap=0.18, bargroupgap=0.06, uniformtext=_UNIFORMTEXT
     )
+    if with_key:
+        return fig, _content_key("freq_h", top_idx, top_vals, title=title, compact=compact)
     return fig
 
-def make_top_frequency_vertical(freq_series: pd.Series, topn: int, title: str, compact=False) -> go.Figure:
-    s = freq_series.sort_values(ascending=False).head(topn)
-    x = [f"{i:02d}" for i in s.index]
-    y = s.values
-    colors = ["#60A5FA"] * len(x)
-    for i in range(min(5, len(x))):
-        colors[i] = "#3B82F6"
+@st.cache_data(show_spinner=False)
+def make_top_frequency_vertical(freq_series: pd.Series, topn: int, title: str, compact=False,
+                                with_key: bool = False) -> go.Figure | tuple[go.Figure, str]:
+    """with_key=True면 (fig, 내용 해시 키) — 같은 데이터/옵션이면 키가 같아 중복 렌더 판별·render_fig 키로 사용."""
+    top_idx, top_vals = _top_n(freq_series, topn)
+    x = _num_labels_for(top_idx)
+    y = top_vals
+    colors = np.where(np.arange(len(x)) < 5, _COLOR_ACCENT, _COLOR_BASE).tolist()
     height = _scale(340, compact)
-    ymax = float(max(y)) * 1.10
-    fig = go.Figure(go.Bar(
-        x=x, y=y, orientation="v",
-        text=[f"{v:,}" for v in y], textposition="outside", cliponaxis=False,
-        marker=dict(color=colors),
-        hovertemplate="번호 %{x}<br>빈도 %{y:,}회<extra></extra>",
-        showlegend=False
-    ))
-    fig.update_layout(
-        title=title, height=height, margin=dict(l=10,r=10,t=50,b=10),
-        template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
-        title_font=dict(size=18, color="#E5E7EB"),
-        xaxis=dict(title="", tickfont=dict(size=11)),
-        yaxis=dict(title="", range=[0, ymax], showgrid=True, gridcolor="rgba(148,163,184,.22)", zeroline=False, tickfont=dict(size=11)),
-        bargap=0.35, bargroupgap=0.08
+    ymax = float(y.max()) * 1.10 if len(y) else 1.0
+    fig = _figure(
+        _bar_trace(x, y, "v", colors, "번호 %{x}<br>빈도 %{y:,}회<extra></extra>"),
+        title, height=height, margin=_MARGIN_BAR,
+        xaxis=dict(title="", tickfont=_TICKFONT),
+        yaxis=dict(title="", range=[0, ymax], showgrid=True, gridcolor=_GRID, zeroline=False, tickfont=_TICKFONT),
+        bargap=0.35, bargroupgap=0.08, uniformtext=_UNIFORMTEXT
     )
+    if with_key:
+        return fig, _content_key("freq_v", top_idx, top_vals, title=title, compact=compact)
     return fig
 
 # -------- 일반 히트맵 --------
+_Z_DECIMALS = 3
+
+@st.cache_data(show_spinner=False)
 def make_heatmap(matrix: pd.DataFrame, title: str, zmin=None, zmax=None,
                  colorscale="YlGnBu", compact: bool=False, height: int | None=None) -> go.Figure:
-    xlabels = [f"{i:02d}" for i in range(1, matrix.shape[1]+1)]
-    ylabels = [f"{i:02d}" for i in range(1, matrix.shape[0]+1)]
+    xlabels = _num_labels(matrix.shape[1])
+    ylabels = _num_labels(matrix.shape[0])
     h = height if height is not None else _scale(520, compact)
-    fig = go.Figure(go.Heatmap(
-        z=matrix.values, x=xlabels, y=ylabels,
-        colorscale=colorscale, zmin=zmin, zmax=zmax,
-        colorbar=dict(thickness=10, outlinewidth=0, ticks="outside", tickcolor="#94A3B8")
-    ))
-    fig.update_layout(
-        title=title, height=h, margin=dict(l=8,r=8,t=46,b=8),
-        template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
-        title_font=dict(size=18, color="#E5E7EB"),
-        xaxis=dict(showgrid=False, tickfont=dict(size=9)),
-        yaxis=dict(showgrid=False, tickfont=dict(size=9), autorange="reversed")
+    z = matrix.to_numpy()
+    if np.issubdtype(z.dtype, np.floating):
+        # z는 JSON 텍스트로 전송되므로 17자리 float 대신 반올림 (색 구분/호버에는 충분, NaN 유지)
+        z = np.round(z, _Z_DECIMALS)
+    return _figure(
+        dict(type="heatmap", z=z, x=xlabels, y=ylabels,
+             colorscale=colorscale, zmin=zmin, zmax=zmax,
+             colorbar=dict(thickness=10, outlinewidth=0, ticks="outside", tickcolor="#94A3B8")),
+        title, height=h, margin=_MARGIN_HEATMAP,
+        xaxis=dict(showgrid=False, tickfont=_TICKFONT_SMALL),
+        yaxis=dict(showgrid=False, tickfont=_TICKFONT_SMALL, autorange="reversed")
     )
-    return fig
 
+@st.cache_data(show_spinner=False)
 def make_corr_heatmap(corr: pd.DataFrame, title="Correlation Heatmap (Pearson)",
                       compact: bool=False, height: int | None=None) -> go.Figure:
     return make_heatmap(corr, title=title, zmin=-1, zmax=1, colorscale="RdBu",
                         compact=compact, height=height)
 
 # -------- PRO: 상관 히트맵 가시성 강화 --------
-def _reorder_corr(corr: pd.DataFrame, by_abs: bool=True) -> pd.DataFrame:
+_MIN_CLUSTER_N = 8  # 이보다 작으면 재정렬해도 드러날 블록 구조가 없음
+
+def _spectral_order(W: np.ndarray) -> np.ndarray:
+    """
+    유사도 W(비음수, 대칭)의 Fiedler 벡터 순서 — 라플라시안 L = diag(W·1) - W 고유분해 1회.
+    (대각은 L에서 상쇄되므로 그대로 둬도 됨) 부호는 최대 성분이 양수가 되게 고정.
+    """
+    L = np.diag(W.sum(axis=1)) - W
+    _, V = np.linalg.eigh(L)
+    f = V[:, 1]
+    if f[np.argmax(np.abs(f))] < 0:
+        f = -f
+    return np.argsort(f, kind="stable")
+
+@st.cache_data(show_spinner=False)
+def _corr_order(M: np.ndarray, by_abs: bool, use_linkage: bool = False) -> np.ndarray | None:
     """
-    계층 클러스터링으로 변수 순서를 재정렬해 블록 구조를 드러냄.
-    거리 = 1 - |r|  (by_abs=True), 아니면 1 - r를 사용.
+    재정렬 순서만 계산해 캐시 — contrast/삼각 옵션만 바뀌면 재계산 X.
+    by_abs=True: |r|을 유사도로 한 스펙트럴 정렬 (NumPy eigh만 사용, scipy 불필요).
+    by_abs=False(음의 상관은 라플라시안 가중치가 될 수 없음) 또는 use_linkage:
+    계층 클러스터링 — fastcluster가 있으면 사용(같은 linkage 형식), 없으면 scipy. 실패하면 None.
     """
+    n = M.shape[0]
+    if n < _MIN_CLUSTER_N:
+        return None
+    if by_abs and not use_linkage:
+        try:
+            return _spectral_order(np.clip(np.abs(M), 0, 1))
+        except np.linalg.LinAlgError:
+            return None
     try:
-        from scipy.cluster.hierarchy import linkage, leaves_list
+        from scipy.cluster.hierarchy import leaves_list
         from scipy.spatial.distance import squareform
-        M = corr.abs().values if by_abs else corr.values
-        D = 1.0 - np.clip(M, -1, 1)
+        try:
+            from fastcluster import linkage
+        except ImportError:
+            from scipy.cluster.hierarchy import linkage
+        # linkage 내부 float64 변환 복사를 피하도록 처음부터 float64 C-연속으로
+        D = np.ascontiguousarray(1.0 - np.clip(np.abs(M) if by_abs else M, -1, 1), dtype=np.float64)
         np.fill_diagonal(D, 0.0)
         Z = linkage(squareform(D, checks=False), method="average")
-        order = leaves_list(Z)
-        idx = corr.index.to_numpy()[order]
-        return corr.loc[idx, idx]
+        return leaves_list(Z)
     except Exception:
-        # scipy 미사용/에러 시 원본 반환
+        return None
+
+def _reorder_corr(corr: pd.DataFrame, by_abs: bool=True, use_linkage: bool=False) -> pd.DataFrame:
+    """
+    변수 순서를 재정렬해 블록 구조를 드러냄.
+    |r| 기준(by_abs=True)은 스펙트럴 정렬, 아니면(또는 use_linkage) 거리 1 - r의 계층 클러스터링.
+    """
+    order = _corr_order(corr.to_numpy(dtype=np.float64), by_abs, use_linkage)
+    if order is None:
+        # 작은 행렬/scipy 미사용/에러 시 원본 반환
         return corr
+    return corr.iloc[order, order]
 
+@st.cache_data(show_spinner=False)
 def make_corr_heatmap_pro(
     corr: pd.DataFrame,
     title: str = "Correlation Heatmap",
@@ -143,20 +274,23 @@ def make_corr_heatmap_pro(
     triangle: bool = True,           # 하삼각만 표시
     contrast: float = 0.25,          # 표시 범위(±r) 또는 [0, r] (abs_mode)
     compact: bool = False,
-    height: int | None = None
+    height: int | None = None,
+    use_linkage: bool = False        # |r|에서도 linkage 정렬 (비교/디버그용)
 ) -> go.Figure:
     # 1) 변환
     M = corr.abs() if abs_mode else corr.copy()
 
     # 2) 재정렬
     if cluster:
-        M = _reorder_corr(M, by_abs=abs_mode)
+        M = _reorder_corr(M, by_abs=abs_mode, use_linkage=use_linkage)
 
     # 3) 삼각 마스킹(상삼각 NaN)
     if triangle:
-        mask = np.triu(np.ones_like(M.values, dtype=bool), k=1)
-        Z = M.values.astype(float).copy()
-        Z[mask] = np.nan
+        # 전체 bool 마스크 없이 상삼각 인덱스로 바로 채움 (astype이 이미 사본이라 추가 copy 불필요)
+        # float32로 낮추지 않음: Plotly 5는 배열을 JSON 텍스트로 보내며, 기본 json 엔진(orjson 미설치)에서는
+        # float32가 float64로 풀려 자릿수가 오히려 늘어남
+        Z = M.to_numpy(dtype=np.float64, copy=True)
+        Z[np.triu_indices(Z.shape[0], k=1)] = np.nan
         M_plot = pd.DataFrame(Z, index=M.index, columns=M.columns)
     else:
         M_plot = M
@@ -177,49 +311,93 @@ def make_corr_heatmap_pro(
 
 # viz.py — add this at the end
 
-def make_top_pairs_vertical(top_df: pd.DataFrame, title: str, compact: bool=False) -> go.Figure:
+@st.cache_data(show_spinner=False)
+def make_top_pairs_vertical(top_df: pd.DataFrame, title: str, compact: bool=False,
+                            with_key: bool = False) -> go.Figure | tuple[go.Figure, str]:
     """
     Top 쌍(공출현) 세로 막대 차트
     - 입력 컬럼 호환: (num_a,num_b,co_count[,significant]) 또는 (A,B,co_count)
     - significant=True인 항목은 붉은색으로 하이라이트
     - compact=True면 높이를 축소해 요약 레이아웃에 적합
+    - with_key=True면 (fig, 내용 해시 키) 반환 (쌍 라벨·공출현 수·유의 여부 기준)
     """
-    df = top_df.copy()
+    df = top_df  # 읽기만 하므로 복사 불필요
 
     if {"num_a", "num_b"}.issubset(df.columns):
-        pair_label = df.apply(lambda r: f"{int(r['num_a']):02d}-{int(r['num_b']):02d}", axis=1)
-        counts = df["co_count"].astype(int).values
-        sig = df["significant"].values if "significant" in df.columns else [False] * len(df)
+        col_a, col_b = "num_a", "num_b"
+        sig = (df["significant"].to_numpy(dtype=np.bool_) if "significant" in df.columns
+               else np.zeros(len(df), dtype=np.bool_))
     else:
         # fallback: (A,B,co_count)
-        pair_label = df.apply(lambda r: f"{int(r['A']):02d}-{int(r['B']):02d}", axis=1)
-        counts = df["co_count"].astype(int).values
-        sig = [False] * len(df)
+        col_a, col_b = "A", "B"
+        sig = np.zeros(len(df), dtype=np.bool_)
+    # "07-23" 형식 라벨을 행 단위 apply 대신 문자열 배열 연산으로
+    a = np.char.mod("%02d", df[col_a].to_numpy(dtype=np.int64))
+    b = np.char.mod("%02d", df[col_b].to_numpy(dtype=np.int64))
+    pair_label = np.char.add(np.char.add(a, "-"), b)
+    counts = df["co_count"].to_numpy(dtype=np.int32)
 
-    x = list(pair_label)
-    y = list(counts)
-    colors = ["#EF4444" if s else "#3B82F6" for s in sig]
+    x = pair_label.tolist()
+    y = counts
+    colors = np.where(sig, _COLOR_SIG, _COLOR_ACCENT).tolist()
 
     height = _scale(340, compact)
-    ymax = float(max(y)) * 1.10 if len(y) else 1.0
-
-    fig = go.Figure(go.Bar(
-        x=x, y=y, orientation="v",
-        text=[f"{v:,}" for v in y], textposition="outside", cliponaxis=False,
-        marker=dict(color=colors),
-        hovertemplate="쌍 %{x}<br>공출현 %{y:,}회<extra></extra>",
-        showlegend=False
-    ))
-    fig.update_layout(
-        title=title, height=height, margin=dict(l=10, r=10, t=50, b=10),
-        template="plotly_dark",
-        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
-        title_font=dict(size=18, color="#E5E7EB"),
-        xaxis=dict(title="", tickfont=dict(size=11)),
+    ymax = float(y.max()) * 1.10 if len(y) else 1.0
+
+    fig = _figure(
+        _bar_trace(x, y, "v", colors, "쌍 %{x}<br>공출현 %{y:,}회<extra></extra>"),
+        title, height=height, margin=_MARGIN_BAR,
+        xaxis=dict(title="", tickfont=_TICKFONT),
         yaxis=dict(
             title="", range=[0, ymax], showgrid=True,
-            gridcolor="rgba(148,163,184,.22)", zeroline=False, tickfont=dict(size=11)
+            gridcolor=_GRID, zeroline=False, tickfont=_TICKFONT
         ),
-        bargap=0.35, bargroupgap=0.08
+        bargap=0.35, bargroupgap=0.08, uniformtext=_UNIFORMTEXT
     )
+    if with_key:
+        return fig, _content_key("pairs", pair_label.astype("U5"), counts, sig, title=title, compact=compact)
     return fig
+
+# -------- 렌더링 --------
+def _fig_json(fig: go.Figure) -> str:
+    if orjson is not None:
+        return orjson.dumps(fig.to_plotly_json(),
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    return fig.to_json()
+
+# 인라인 <script>에 넣을 JSON: 문자열 속 </script>, <!-- 등이 스크립트를 끊지 않도록 이스케이프
+_SCRIPT_ESCAPES = str.maketrans({"<": "\\u003c", ">": "\\u003e", "&": "\\u0026"})
+
+def render_fig(fig: go.Figure, key: str | None = None, fast: bool = False, slot: str | None = None):
+    """
+    Figure 출력. 기본은 st.plotly_chart 그대로.
+    fast=True면 직렬화한 JSON을 session_state에 보관해 재실행 시 재직렬화 없이
+    components.html + Plotly.js(CDN)로 그림. key는 데이터가 바뀌면 달라져야 함
+    → make_top_*(..., with_key=True)가 돌려주는 내용 해시 키를 그대로 쓰면 안전.
+    보관은 차트 자리(slot, 기본은 key의 "-" 앞 종류명)당 1개 — 키가 바뀌면 이전 것을 덮어씀.
+    """
+    if not fast:
+        st.plotly_chart(fig, use_container_width=True, key=key)
+        return
+    import streamlit.components.v1 as components
+    from plotly.offline import get_plotlyjs_version
+
+    state_key = f"_render_fig:{slot or key.split('-', 1)[0]}" if key else None
+    cached = st.session_state.get(state_key) if state_key else None
+    if cached is not None and cached[0] == key:
+        blob = cached[1]
+    else:
+        blob = _fig_json(fig).translate(_SCRIPT_ESCAPES)
+        if state_key:
+            st.session_state[state_key] = (key, blob)
+    div_id = f"fig-{key or 'anon'}"
+    height = int(fig.layout.height or 450)
+    components.html(
+        f"""<div id="{div_id}" style="width:100%;height:{height}px;"></div>
+<script src="https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"></script>
+<script>
+  const spec = {blob};
+  Plotly.react("{div_id}", spec.data, spec.layout, {{responsive: true, displaylogo: false}});
+</script>""",
+        height=height + 10,
+    )